@@ -12,21 +12,53 @@ The messages may be of several types, but they all contain a "type" field.
 #####################################
 
 # Import packages from Python Standard Library
-import json
+import mmap # to read the file through a memory map
 import os # for file operations
 import sys # to exit early
-import time
 import pathlib
-from collections import defaultdict  # data structure for counting author occurrences
+import queue # to hand parsed messages from the reader thread to the chart
+import threading # to read the file on a background thread
 
 # IMPORTANT
 # Import Matplotlib.pyplot for live plotting
 import matplotlib.pyplot as plt
+import numpy as np
+
+# Import external packages (must be installed in .venv first)
+from dotenv import load_dotenv
+
+# msgspec parses JSON bytes straight into typed objects
+import msgspec
+
+# Watchdog wakes us up when the file changes instead of polling it
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
 
 # Import functions from local modules
 from utils.utils_logger import logger
 
 
+#####################################
+# Load Environment Variables
+#####################################
+
+load_dotenv()
+
+#####################################
+# Getter Functions for .env Variables
+#####################################
+
+
+def get_chart_panels() -> int:
+    """Fetch the number of chart panels (2 or 4) from environment or use default."""
+    panels = int(os.getenv("CHART_PANELS", 4))
+    if panels not in (2, 4):
+        logger.warning(f"CHART_PANELS must be 2 or 4, got {panels}. Using 4.")
+        panels = 4
+    logger.info(f"Chart panels: {panels}")
+    return panels
+
+
 #####################################
 # Set up Paths - read from the file the producer writes
 #####################################
@@ -43,133 +75,492 @@ logger.info(f"Data file: {DATA_FILE}")
 # Set up data structures
 #####################################
 
-author_counts = defaultdict(int)
+# Nutrients reported by diet messages, shown as one bar stack each
+DIET_FIELDS: list = ["calories", "carbs", "protein", "fat"]
+
+# Number of most recent values kept (and charted) for each line
+HISTORY_CAPACITY: int = 4096
+
+# x values for a full history window, shared by every line
+HISTORY_X = np.arange(HISTORY_CAPACITY)
+
+
+class RingBuffer:
+    """Fixed-size history of numbers that keeps only the newest values."""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        # Each value is stored twice, capacity apart, so the newest
+        # values can always be returned as one contiguous slice
+        self.data = np.zeros(2 * capacity, dtype=np.float32)
+        self.count = 0
+
+    def append(self, value: float) -> None:
+        """Add a value, overwriting the oldest one when full."""
+        i = self.count % self.capacity
+        self.data[i] = value
+        self.data[i + self.capacity] = value
+        self.count += 1
+
+    def view(self) -> np.ndarray:
+        """Return the stored values, oldest first, without copying."""
+        if self.count <= self.capacity:
+            return self.data[: self.count]
+        start = self.count % self.capacity
+        return self.data[start : start + self.capacity]
+
+
+# Recent history of each charted value, in the order the messages arrived
+history: dict = {
+    "heart_rate": RingBuffer(HISTORY_CAPACITY),
+    "steps": RingBuffer(HISTORY_CAPACITY),
+    "exercise_duration": RingBuffer(HISTORY_CAPACITY),
+    "exercise_distance": RingBuffer(HISTORY_CAPACITY),
+}
+
+# Running diet totals: one row per author, one column per nutrient
+diet_totals = np.zeros((0, len(DIET_FIELDS)))
+
+# Row of diet_totals for each author, in order of first appearance
+diet_authors: dict = {}
+
+
+def get_diet_row(author: str) -> int:
+    """Return the diet_totals row for an author, adding a row for new authors."""
+    global diet_totals
+
+    row = diet_authors.get(author)
+    if row is None:
+        row = diet_authors[author] = len(diet_authors)
+        diet_totals = np.pad(diet_totals, ((0, 1), (0, 0)))
+    return row
 
 #####################################
 # Set up live visuals
+# The figure, axes, and artists are created once by init_ui() and
+# then updated in place - recreating them for every message is slow.
+# Data artists are marked animated so they can be blitted
+# over a cached copy of the static axes background.
+# Nothing is created at import, so importing this module opens no window.
 #####################################
 
-fig, ax = plt.subplots()
-plt.ion()  # Turn on interactive mode for live updates
+# Redraw at most this often (seconds) - about 30 frames per second
+MIN_FRAME_INTERVAL: float = 1 / 30
 
-#####################################
-# Define an update chart function for live plotting
-# This will get called every time a new message is processed
-#####################################
+# GUI backends to try, fastest first. mplcairo is optional (pip install mplcairo);
+# QtAgg needs PyQt6 from requirements.txt. The default (often TkAgg) is slower.
+PREFERRED_BACKENDS: list = ["module://mplcairo.qt", "QtAgg"]
 
+# The live figure, created by init_ui()
+fig = None
 
-def update_chart():
-    """Update the live chart with the latest author counts."""
-    # Prepare data for each subplot
-    # 1. Line chart for heart_rate (assume messages have 'heart_rate' field)
-    # 2. Line chart for steps (assume messages have 'steps' field)
+# Line artist for each charted history series
+series_lines: dict = {}
 
-    # We'll need to store historical data for line charts
-    if not hasattr(update_chart, "history"):
-        update_chart.history = {
-            "heart_rate": [],
-            "steps": [],
-        }
+# Diet totals axes (4-panel layout only)
+diet_ax = None
 
-    history = update_chart.history
+# Bar artists (one per nutrient) for each author stacked in the diet chart
+diet_bars: dict = {}
 
-    # Update history with latest author_counts
-    history["authors"] = list(author_counts.keys())
-    # history["msg_count"] += 1
+# Animated artists grouped by the axes they are drawn in
+animated_artists: dict = {}
 
-    # For demonstration, assume the last processed message is available as a global
-    # In real code, you would refactor to pass the latest message data to update_chart
-    latest_msg = getattr(update_chart, "latest_msg", {})
-    author = latest_msg.get("author", "unknown")
+# Cached static background (frame, ticks, labels) of each axes
+backgrounds: dict = {}
 
-    # Update heart_rate
-    if "heart_rate" in latest_msg:
-        history["heart_rate"].append(latest_msg["heart_rate"])
-    # else:
-    #     history["heart_rate"].append(None)
 
-    # Update steps
-    if "steps" in latest_msg:
-        history["steps"].append(latest_msg["steps"])
-    # else:
-    #     history["steps"].append(None)
+def select_backend() -> None:
+    """
+    Switch Matplotlib to the first preferred backend that loads.
+    Keeps Matplotlib's own choice if none do, or if MPLBACKEND is set.
+    """
+    if "MPLBACKEND" not in os.environ:
+        for backend in PREFERRED_BACKENDS:
+            try:
+                plt.switch_backend(backend)
+                break
+            except ImportError as e:
+                logger.info(f"Backend {backend} not available: {e}")
+    logger.info(f"Matplotlib backend: {plt.get_backend()}")
 
-    # Clear and set up subplots
-    fig.clf()
-    axs = fig.subplots(1, 2)
-    axs = axs.flatten()
+
+def init_ui() -> None:
+    """
+    Create the live figure and its persistent artists.
+    2 panels chart heart rate and steps; 4 panels add diet totals and exercise.
+    Safe to call more than once - the axes are only ever created the first time.
+    """
+    global fig, diet_ax
+
+    # Reuse the figure and axes we already have
+    if fig is not None:
+        return
+
+    panels = get_chart_panels()
+    select_backend()
+
+    # Constrained layout sets the padding when the figure is fully drawn,
+    # so there is no tight_layout() call on the per-frame path
+    if panels == 2:
+        fig, (ax_hr, ax_steps) = plt.subplots(1, 2, layout="constrained")
+    else:
+        fig, ((ax_hr, ax_steps), (ax_diet, ax_ex)) = plt.subplots(
+            2, 2, layout="constrained"
+        )
 
     # 1. Line chart for heart_rate
-    ax = axs[0]
-    ax.plot(history["heart_rate"], marker="o", color="red")
-    ax.set_title("Heart Rate")
-    ax.set_ylabel("BPM")
+    (hr_line,) = ax_hr.plot([], [], marker="o", color="red", animated=True)
+    ax_hr.set_title("Heart Rate")
+    ax_hr.set_ylabel("BPM")
+    series_lines["heart_rate"] = hr_line
+    animated_artists[ax_hr] = [hr_line]
+
+    # 2. Line chart for steps
+    (steps_line,) = ax_steps.plot([], [], marker="o", color="blue", animated=True)
+    ax_steps.set_title("Steps")
+    ax_steps.set_ylabel("Steps")
+    series_lines["steps"] = steps_line
+    animated_artists[ax_steps] = [steps_line]
+
+    if panels == 4:
+        # 3. Stacked bar chart for running diet totals by author
+        # Bars are added by flush_chart as authors appear, then resized in place
+        ax_diet.set_title("Diet Totals")
+        diet_ax = ax_diet
+        animated_artists[ax_diet] = []
+
+        # 4. Line chart for exercise duration and distance
+        (ex_dur_line,) = ax_ex.plot(
+            [], [], marker="o", color="green", label="Duration (min)", animated=True
+        )
+        (ex_dist_line,) = ax_ex.plot(
+            [], [], marker="o", color="purple", label="Distance (mi)", animated=True
+        )
+        ax_ex.set_title("Exercise")
+        ax_ex.legend(loc="upper left")
+        series_lines["exercise_duration"] = ex_dur_line
+        series_lines["exercise_distance"] = ex_dist_line
+        animated_artists[ax_ex] = [ex_dur_line, ex_dist_line]
+
+    # A full redraw (first show, window resize, new limits) refreshes the cache
+    fig.canvas.mpl_connect("draw_event", capture_backgrounds)
+
+
+def capture_backgrounds(event=None) -> None:
+    """Cache each axes background after a full redraw, then draw the data on top."""
+    for ax, artists in animated_artists.items():
+        backgrounds[ax] = fig.canvas.copy_from_bbox(ax.bbox)
+        for artist in artists:
+            ax.draw_artist(artist)
+
+
+#####################################
+# Define a flush chart function for live plotting
+# A figure timer calls this on the main thread once per
+# MIN_FRAME_INTERVAL; messages are parsed on the reader thread.
+#####################################
 
-    # 3. Line chart for steps
-    ax = axs[1]
-    ax.plot(history["steps"], marker="o", color="blue")
-    ax.set_title("Steps")
-    ax.set_ylabel("Steps")
 
-    plt.tight_layout()
-    plt.draw()
-    plt.pause(0.01)
+def record_queued_messages(message_queue: queue.Queue) -> int:
+    """Record every parsed message waiting on the queue and return how many there were."""
+    count = 0
+    while True:
+        try:
+            msg = message_queue.get_nowait()
+        except queue.Empty:
+            return count
+        record_message(msg)
+        count += 1
+
+
+def flush_chart(message_queue: queue.Queue) -> None:
+    """Record the queued messages, then draw anything new onto the live chart."""
+    record_queued_messages(message_queue)
+
+    # Nothing new to show
+    if not flush_chart.stale:
+        return
+    flush_chart.stale = False
+
+    # Hand views of the latest history to the existing artists (no copies)
+    for name, line in series_lines.items():
+        values = history[name].view()
+        line.set_data(HISTORY_X[: len(values)], values)
+
+    # Any new artists or legend entries need a full redraw
+    full_redraw = not backgrounds
+
+    if diet_ax is not None:
+        # Give each new author a row of bars in the stack
+        for author in diet_authors:
+            if author in diet_bars:
+                continue
+            bars = diet_ax.bar(DIET_FIELDS, 0, label=author, animated=True)
+            diet_bars[author] = list(bars)
+            animated_artists[diet_ax].extend(bars)
+            if len(diet_bars) > 1:
+                # Legend swatches copy the animated flag - keep them in the background
+                legend = diet_ax.legend(loc="upper right")
+                for handle in legend.legend_handles:
+                    handle.set_animated(False)
+            full_redraw = True
+
+        # Each author's bars sit on top of the authors before them
+        bottoms = np.cumsum(diet_totals, axis=0) - diet_totals
+        for author, bars in diet_bars.items():
+            row = diet_authors[author]
+            for bar, height, bottom in zip(bars, diet_totals[row], bottoms[row]):
+                bar.set_y(bottom)
+                bar.set_height(height)
+
+    # Rescale each axes to fit its (possibly new) data
+    for ax in animated_artists:
+        old_limits = (ax.get_xlim(), ax.get_ylim())
+        ax.relim()
+        ax.autoscale_view()
+        if (ax.get_xlim(), ax.get_ylim()) != old_limits:
+            full_redraw = True
+
+    if full_redraw:
+        # Ticks or artists changed, so the cached backgrounds are stale - redraw everything
+        fig.canvas.draw()
+        fig.canvas.blit(fig.bbox)
+    else:
+        # Only the data changed - paste the backgrounds and redraw the data
+        for ax, artists in animated_artists.items():
+            fig.canvas.restore_region(backgrounds[ax])
+            for artist in artists:
+                ax.draw_artist(artist)
+            fig.canvas.blit(ax.bbox)
+
+
+# True when messages have been recorded but not drawn yet
+flush_chart.stale = False
 
 
 #####################################
-# Process Message Function
+# Define the message schema
+# Every message has the same small set of fields, so msgspec can
+# parse and validate straight into a typed object in one pass.
 #####################################
 
 
-def process_message(message: str) -> None:
+class BiometricMessage(msgspec.Struct):
+    """One biometric message. Only the fields for its type are present."""
+
+    type: str = "unknown"
+    author: str = "unknown"
+    heart_rate: int | None = None
+    steps: int | None = None
+    calories: int = 0
+    carbs: int = 0
+    protein: int = 0
+    fat: int = 0
+    exercise_duration: int | None = None  # in minutes
+    exercise_distance: float | None = None  # in miles
+
+
+# Reusable decoder for the schema above
+message_decoder = msgspec.json.Decoder(BiometricMessage)
+
+#####################################
+# Ingest Message Functions
+# Parsing and recording are separate so the reader thread
+# can parse while the main thread records and draws.
+#####################################
+
+
+def parse_message(message: bytes) -> BiometricMessage | None:
     """
-    Process a single JSON message and update the chart.
+    Parse a single JSON message.
 
     Args:
-        message (str): The JSON message as a string.
+        message (bytes): The JSON message as raw bytes from the file.
+
+    Returns:
+        BiometricMessage | None: The parsed message, or None if it does not fit the schema.
     """
-    
     try:
         # Log the raw message for debugging
-        logger.debug(f"Raw message: {message}")
+        # Passing it as an argument means loguru only formats it
+        # when a DEBUG handler is active
+        logger.debug("Raw message: {}", message)
+
+        # Parse and validate the JSON bytes in one step
+        msg = message_decoder.decode(message)
+
+        # Ensure the processed message is logged for debugging
+        logger.debug("Processed JSON message: {}", msg)
+
+    except msgspec.DecodeError as e:
+        logger.error(f"Invalid JSON message: {message} ({e})")
+        return None
 
-        # Parse the JSON string into a Python dictionary
-        message_dict: dict = json.loads(message)
-       
-        # Ensure the processed JSON is logged for debugging
-        logger.info(f"Processed JSON message: {message_dict}")
+    return msg
 
-        # Ensure it's a dictionary before accessing fields
-        if isinstance(message_dict, dict):
-            # Extract the 'type' field from the Python dictionary
-            message_type = message_dict.get("type", "unknown")
-            logger.info(f"Message received of type: {message_type}")
 
-            # Filter down to only relevant message types for demo
-            if message_type != "heart_rate" and message_type != "steps":
-                return
+def record_heart_rate(msg: BiometricMessage) -> None:
+    """Record the value from a heart rate message."""
+    history["heart_rate"].append(msg.heart_rate)
 
-            # Store the latest message for chart updating
-            update_chart.latest_msg = message_dict
 
-            # Log the updated counts
-            logger.info(f"Message sent to chart {dict(message_dict)}")
+def record_steps(msg: BiometricMessage) -> None:
+    """Record the value from a steps message."""
+    history["steps"].append(msg.steps)
 
-            # Update the chart
-            update_chart()
 
-            # Log the updated chart
-            logger.info(f"Chart updated successfully for message: {message}")
+def record_diet(msg: BiometricMessage) -> None:
+    """Add a diet message to its author's running totals."""
+    row = get_diet_row(msg.author)
+    # Same order as DIET_FIELDS
+    diet_totals[row] += [msg.calories, msg.carbs, msg.protein, msg.fat]
 
-        else:
-            logger.error(f"Expected a dictionary but got: {type(message_dict)}")
 
-    except json.JSONDecodeError:
-        logger.error(f"Invalid JSON message: {message}")
+def record_exercise(msg: BiometricMessage) -> None:
+    """Record the values from an exercise message."""
+    history["exercise_duration"].append(msg.exercise_duration)
+    history["exercise_distance"].append(msg.exercise_distance)
+
+
+# Record function for each message type we chart
+HANDLERS: dict = {
+    "heart_rate": record_heart_rate,
+    "steps": record_steps,
+    "diet": record_diet,
+    "exercise": record_exercise,
+}
+
+
+def record_message(msg: BiometricMessage) -> None:
+    """
+    Record the data carried by a parsed message for the chart.
+
+    Args:
+        msg (BiometricMessage): A message returned by parse_message.
+    """
+    try:
+        # Filter down to only the message types we chart
+        handler = HANDLERS.get(msg.type)
+        if handler is None:
+            return
+
+        # Record the values this message type carries
+        handler(msg)
+
+        # Let the next flush_chart know there is something new to draw
+        flush_chart.stale = True
+
+        # Log the recorded message (formatted lazily by loguru)
+        logger.info("Message of type {} recorded for chart: {}", msg.type, msg)
+
     except Exception as e:
         logger.error(f"Error processing message: {e}")
 
 
+#####################################
+# Watch the data file for changes
+#####################################
+
+
+class DataFileHandler(FileSystemEventHandler):
+    """Set an event whenever the producer modifies the data file."""
+
+    def __init__(self, file_changed: threading.Event) -> None:
+        self.file_changed = file_changed
+
+    def on_modified(self, event) -> None:
+        if pathlib.Path(event.src_path).name == DATA_FILE.name:
+            self.file_changed.set()
+
+
+#####################################
+# Read new lines through a memory map
+#####################################
+
+
+class MappedFileTail:
+    """Read lines appended to an open file by scanning a memory map of it."""
+
+    def __init__(self, fd: int) -> None:
+        self.fd = fd
+        self.mm = None
+        # Start at the current end of the file, like seek(0, os.SEEK_END)
+        self.cursor = os.fstat(fd).st_size
+
+    def read_lines(self):
+        """Yield each complete line (without the newline) written since the last call."""
+        size = os.fstat(self.fd).st_size
+
+        # The file was truncated or replaced - start again from the top
+        if size < self.cursor:
+            self.cursor = 0
+
+        # An empty file cannot be mapped
+        if size == 0:
+            return
+
+        # Remap only when the file size changed since the last mapping
+        if self.mm is None or size != len(self.mm):
+            self.close()
+            self.mm = mmap.mmap(self.fd, size, access=mmap.ACCESS_READ)
+
+        # Hand out complete lines; a partial last line waits for the next call
+        while (newline := self.mm.find(b"\n", self.cursor)) != -1:
+            line = self.mm[self.cursor:newline]
+            self.cursor = newline + 1
+            yield line
+
+    def close(self) -> None:
+        """Release the current memory map, if any."""
+        if self.mm is not None:
+            self.mm.close()
+            self.mm = None
+
+
+#####################################
+# Tail the data file on a background thread
+#####################################
+
+
+def tail_loop(message_queue: queue.Queue, stop: threading.Event) -> None:
+    """
+    Wait for the data file to change and put each new parsed message on the queue.
+    Runs on a background thread so reading never waits on drawing.
+    """
+    # Watch the data folder - the handler signals file_changed
+    file_changed = threading.Event()
+    observer = Observer()
+    observer.schedule(DataFileHandler(file_changed), str(DATA_FOLDER), recursive=False)
+    observer.start()
+
+    try:
+        # Map the file and start reading at its current end
+        with open(DATA_FILE, "rb") as file:
+            tail = MappedFileTail(file.fileno())
+            try:
+                while not stop.is_set():
+                    # Wake up now and then to notice the stop request
+                    if not file_changed.wait(timeout=0.5):
+                        continue
+                    file_changed.clear()
+
+                    # Parse every line that was appended since the last wakeup
+                    for line in tail.read_lines():
+                        # Skip blank lines (a lone \r is a blank Windows line)
+                        if line and line != b"\r":
+                            msg = parse_message(line)
+                            if msg is not None:
+                                message_queue.put(msg)
+            finally:
+                tail.close()
+    except Exception as e:
+        logger.error(f"Unexpected error: {e}")
+    finally:
+        observer.stop()
+        observer.join()
+
+
 #####################################
 # Main Function
 #####################################
@@ -178,7 +569,7 @@ def process_message(message: str) -> None:
 def main() -> None:
     """
     Main entry point for the consumer.
-    - Monitors a file for new messages and updates a live chart.
+    - Reads new messages on a background thread and updates a live chart.
     """
 
     logger.info("START consumer.")
@@ -188,36 +579,32 @@ def main() -> None:
         logger.error(f"Data file {DATA_FILE} does not exist. Exiting.")
         sys.exit(1)
 
-    try:
-        # Try to open the file and read from it
-        with open(DATA_FILE, "r") as file:
-
-            # Move the cursor to the end of the file
-            file.seek(0, os.SEEK_END)
-            print("Consumer is ready and waiting for new JSON messages...")
-
-            while True:
-                # Read the next line from the file
-                line = file.readline()
-
-                # If we strip whitespace from the line and it's not empty
-                if line.strip():  
-                    # Process this new message
-                    process_message(line)
-                else:
-                    # otherwise, wait a half second before checking again
-                    logger.debug("No new messages. Waiting...")
-                    delay_secs = 0.5 
-                    time.sleep(delay_secs) 
-                    continue 
+    # Create the live chart window
+    init_ui()
+
+    # Read and parse the file on a background thread
+    message_queue = queue.Queue()
+    stop = threading.Event()
+    reader = threading.Thread(target=tail_loop, args=(message_queue, stop), daemon=True)
+    reader.start()
+    print("Consumer is ready and waiting for new JSON messages...")
+
+    # Record and draw the queued messages on the main thread about 30 times per second
+    timer = fig.canvas.new_timer(interval=int(MIN_FRAME_INTERVAL * 1000))
+    timer.add_callback(flush_chart, message_queue)
+    timer.start()
 
+    try:
+        # Show the window - this blocks until it is closed
+        plt.show()
     except KeyboardInterrupt:
         logger.info("Consumer interrupted by user.")
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
     finally:
-        plt.ioff()
-        plt.show()
+        timer.stop()
+        stop.set()
+        reader.join(timeout=1)
         logger.info("Consumer closed.")
 
 
@@ -0,0 +1,162 @@
+"""
+project_consumer_gillespie_qt.py
+
+Read a JSON-formatted file as it is being written.
+
+Same biometric charts as project_consumer_gillespie.py, drawn with pyqtgraph
+instead of Matplotlib. pyqtgraph is built for live data, so this version keeps
+up with much higher message rates.
+
+Message handling (file tailing, parsing, history, diet totals) is shared with
+project_consumer_gillespie.py. Its background thread tails and parses the file,
+and a Qt timer records the parsed messages and redraws about 30 times per second.
+"""
+
+#####################################
+# Import Modules
+#####################################
+
+# Import packages from Python Standard Library
+import queue # to hand parsed messages from the reader thread to the UI
+import signal # to close the window with CTRL c
+import sys # to exit early
+import threading
+
+# Import external packages (must be installed in .venv first)
+import numpy as np
+import pyqtgraph as pg
+from pyqtgraph.Qt import QtCore
+
+# Import functions from local modules
+import consumers.project_consumer_gillespie as consumer
+from utils.utils_logger import logger
+
+
+#####################################
+# Set up live visuals
+# Filled in by init_ui() - one curve per history series
+#####################################
+
+# Curve item for each charted history series
+curves: dict = {}
+
+# Diet totals bar item (4-panel layout only)
+diet_item = None
+
+
+def init_ui() -> pg.GraphicsLayoutWidget:
+    """
+    Create the live chart window and its persistent plot items.
+    2 panels chart heart rate and steps; 4 panels add diet totals and exercise.
+    """
+    global diet_item
+
+    panels = consumer.get_chart_panels()
+
+    win = pg.GraphicsLayoutWidget(title="Live Biometrics")
+
+    # 1. Line chart for heart_rate
+    hr_plot = win.addPlot(title="Heart Rate")
+    hr_plot.setLabel("left", "BPM")
+    curves["heart_rate"] = hr_plot.plot(pen="r")
+
+    # 2. Line chart for steps
+    steps_plot = win.addPlot(title="Steps")
+    steps_plot.setLabel("left", "Steps")
+    curves["steps"] = steps_plot.plot(pen="b")
+
+    if panels == 4:
+        win.nextRow()
+
+        # 3. Bar chart for running diet totals (all authors combined)
+        diet_plot = win.addPlot(title="Diet Totals")
+        diet_item = pg.BarGraphItem(
+            x=np.arange(len(consumer.DIET_FIELDS)),
+            height=np.zeros(len(consumer.DIET_FIELDS)),
+            width=0.8,
+            brush="orange",
+        )
+        diet_plot.addItem(diet_item)
+        diet_plot.getAxis("bottom").setTicks([list(enumerate(consumer.DIET_FIELDS))])
+
+        # 4. Line chart for exercise duration and distance
+        ex_plot = win.addPlot(title="Exercise")
+        ex_plot.addLegend()
+        curves["exercise_duration"] = ex_plot.plot(pen="g", name="Duration (min)")
+        curves["exercise_distance"] = ex_plot.plot(pen="m", name="Distance (mi)")
+
+    win.show()
+    return win
+
+
+#####################################
+# Define a flush chart function for live plotting
+# A Qt timer calls this about 30 times per second
+#####################################
+
+
+def flush_chart(message_queue: queue.Queue) -> None:
+    """Record every queued message, then update the curves if anything arrived."""
+    if not consumer.record_queued_messages(message_queue):
+        return
+
+    # setData replaces the curve data in place - no clearing or re-plotting
+    for name, curve in curves.items():
+        curve.setData(consumer.history[name].view())
+    if diet_item is not None:
+        diet_item.setOpts(height=consumer.diet_totals.sum(axis=0))
+
+
+#####################################
+# Main Function
+#####################################
+
+
+def main() -> None:
+    """
+    Main entry point for the consumer.
+    - Reads new messages on a background thread and updates a live pyqtgraph chart.
+    """
+
+    logger.info("START consumer.")
+
+    # Verify the file we're monitoring exists if not, exit early
+    if not consumer.DATA_FILE.exists():
+        logger.error(f"Data file {consumer.DATA_FILE} does not exist. Exiting.")
+        sys.exit(1)
+
+    app = pg.mkQApp("Live Biometrics")
+    win = init_ui()
+
+    # Start reading the file in the background
+    message_queue = queue.Queue()
+    stop = threading.Event()
+    reader = threading.Thread(
+        target=consumer.tail_loop, args=(message_queue, stop), daemon=True
+    )
+    reader.start()
+    print("Consumer is ready and waiting for new JSON messages...")
+
+    # Redraw on a timer rather than once per message
+    timer = QtCore.QTimer()
+    timer.timeout.connect(lambda: flush_chart(message_queue))
+    timer.start(int(consumer.MIN_FRAME_INTERVAL * 1000))
+
+    # Qt owns the main loop, so close the window on CTRL c
+    signal.signal(signal.SIGINT, lambda *args: app.quit())
+
+    try:
+        app.exec()
+    finally:
+        stop.set()
+        reader.join(timeout=1)
+        win.close()
+        logger.info("Consumer closed.")
+
+
+#####################################
+# Conditional Execution
+#####################################
+
+if __name__ == "__main__":
+    main()
@@ -14,14 +14,14 @@ Example JSON messages
 #####################################
 
 # Import packages from Python Standard Library
-import json
 import os
-import random
 import time
 import pathlib
 
 # Import external packages (must be installed in .venv first)
 from dotenv import load_dotenv
+import numpy as np
+import orjson
 
 # Import functions from local modules
 from utils.utils_logger import logger
@@ -42,6 +42,13 @@ def get_message_interval() -> int:
     logger.info(f"Message interval: {interval} seconds")
     return interval
 
+
+def get_batch_size() -> int:
+    """Fetch the number of messages written together from environment or use default."""
+    batch_size = max(1, int(os.getenv("BUZZ_BATCH_SIZE", 1)))
+    logger.info(f"Batch size: {batch_size} messages")
+    return batch_size
+
 #####################################
 # Set up Paths - write to a file the consumer will monitor
 #####################################
@@ -60,11 +67,78 @@ DATA_FILE: pathlib.Path = DATA_FOLDER.joinpath("biometrics_live.json")
 logger.info(f"Data file: {DATA_FILE}")
 
 #####################################
-# Define global variables
+# Generate random values in batches
+# NumPy makes a whole batch of random numbers in one call,
+# which is much cheaper than calling random.randint for each value.
 #####################################
 
-# Define some lists for generating buzz messages
-UPDATE_TYPE: list = ["heart_rate", "steps", "diet", "exercise"]
+# Number of random values generated at a time for each field
+RANDOM_BATCH_SIZE: int = 1024
+
+rng = np.random.default_rng()
+
+
+def random_ints(low: int, high: int):
+    """Yield random integers between low and high (inclusive), one batch at a time."""
+    while True:
+        # tolist() turns NumPy integers into plain Python ints for JSON
+        yield from rng.integers(low, high, size=RANDOM_BATCH_SIZE, endpoint=True).tolist()
+
+
+def random_floats(low: float, high: float, decimals: int):
+    """Yield random floats between low and high, rounded, one batch at a time."""
+    while True:
+        values = rng.uniform(low, high, size=RANDOM_BATCH_SIZE)
+        yield from np.round(values, decimals).tolist()
+
+
+# A stream of random values for each message field
+heart_rates = random_ints(60, 100)
+steps_counts = random_ints(0, 100)
+calories = random_ints(200, 800)
+carbs = random_ints(20, 100)
+proteins = random_ints(10, 50)
+fats = random_ints(5, 30)
+exercise_durations = random_ints(10, 60)  # in minutes
+exercise_distances = random_floats(1.0, 10.0, 2)  # in miles
+
+#####################################
+# Define a builder function for each type of message
+#####################################
+
+
+def build_heart_rate() -> dict:
+    """Build a heart rate message."""
+    return {"heart_rate": next(heart_rates), "type": "heart_rate"}
+
+
+def build_steps() -> dict:
+    """Build a steps message."""
+    return {"steps": next(steps_counts), "type": "steps"}
+
+
+def build_diet() -> dict:
+    """Build a diet message."""
+    return {
+        "calories": next(calories),
+        "carbs": next(carbs),
+        "protein": next(proteins),
+        "fat": next(fats),
+        "type": "diet",
+    }
+
+
+def build_exercise() -> dict:
+    """Build an exercise message."""
+    return {
+        "exercise_duration": next(exercise_durations),
+        "exercise_distance": next(exercise_distances),
+        "type": "exercise",
+    }
+
+
+# One builder per update type, picked by a random code (0-3)
+BUILDERS: tuple = (build_heart_rate, build_steps, build_diet, build_exercise)
 
 #####################################
 # Define a function to generate buzz messages
@@ -75,7 +149,7 @@ def generate_messages():
     """
     Generate a stream of fake biometric data in the JSON format
     Example JSON message
-        {"heart_rate": 74}
+        {"heart_rate": 74, "type": "heart_rate"}
 
     This function uses a generator, which yields one buzz at a time.
     Generators are memory-efficient because they produce items on the fly
@@ -84,42 +158,12 @@ def generate_messages():
     Because this function uses a while True loop, it will run continuously 
     until we close the window or hit CTRL c (CMD c on Mac/Linux).
     """
-    while True:
-        this_update_type = random.choice(UPDATE_TYPE)
-
-        if this_update_type == "heart_rate":
-            heart_rate = random.randint(60, 100)
-            json_message = {
-                "heart_rate": heart_rate
-            }
-        elif this_update_type == "steps":
-            steps = random.randint(0, 100)
-            json_message = {
-                "steps": steps
-            }
-        elif this_update_type == "diet":
-            calories = random.randint(200, 800)
-            carbs = random.randint(20, 100)
-            protein = random.randint(10, 50)
-            fat = random.randint(5, 30)
-            json_message = {
-                "calories": calories,
-                "carbs": carbs,
-                "protein": protein,
-                "fat": fat
-            }
-        else:
-            duration = random.randint(10, 60)  # in minutes
-            distance = round(random.uniform(1.0, 10.0), 2)  # in miles
-            json_message = {
-                "exercise_duration": duration,
-                "exercise_distance": distance
-            } 
-
-        json_message["type"] = this_update_type # type: ignore
+    # Local names are faster to look up inside the loop
+    builders = BUILDERS
 
+    for code in random_ints(0, len(builders) - 1):
         # Yield the dictionary to the caller
-        yield json_message
+        yield builders[code]()
 
 
 #####################################
@@ -145,18 +189,36 @@ def main() -> None:
     # Call the function we defined above to get the message interval
     # Assign the return value to a variable called interval_secs
     interval_secs: int = get_message_interval()
+    batch_size: int = get_batch_size()
+
+    # Open the data file once for appending rather than once per message
+    # O_BINARY (Windows only) keeps newlines from being translated
+    flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0)
+    fd = os.open(DATA_FILE, flags, 0o644)
+
+    # Encoded messages waiting to be written
+    batch: list = []
 
     try:
         for message in generate_messages():
             logger.info(message)
-            with DATA_FILE.open("a") as f:
-                f.write(json.dumps(message) + "\n")
+            batch.append(orjson.dumps(message))
+
+            # Write the whole batch with a single system call
+            if len(batch) >= batch_size:
+                os.write(fd, b"\n".join(batch) + b"\n")
+                batch.clear()
+
             time.sleep(interval_secs)
     except KeyboardInterrupt:
         logger.warning("Producer interrupted by user.")
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
     finally:
+        # Don't lose a partly filled batch
+        if batch:
+            os.write(fd, b"\n".join(batch) + b"\n")
+        os.close(fd)
         logger.info("Producer shutting down.")
 
 